@@ -0,0 +1,84 @@
+"""
+Measures cold import time of the project's modules with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter. The parsing and extraction
+modules used by worker processes and reparse.py must not pull in the browser
+stack; the script exits non-zero if any of them does.
+
+    python bench_import_time.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must stay importable without selenium or undetected_chromedriver.
+# main is included because "spawn" pool workers re-import it as __mp_main__.
+PARSE_MODULES = [
+    'records', 'extractors', 'url_store', 'capture_archive', 'reparse',
+    'helper', 'scrape_url_lists', 'driver_supervisor', 'main'
+]
+
+# Modules that drive the browser, measured for comparison
+BROWSER_MODULES = ['tiktok_scraper', 'login']
+
+BROWSER_PACKAGES = ('selenium', 'undetected_chromedriver', 'webdriver_manager', 'psutil', 'tkinter', 'turtle')
+
+
+def measure_import(module):
+    """
+    Imports a module in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        tuple: (cumulative import time in ms, set of top-level packages imported),
+        or (None, stderr) if the import failed.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+
+    cumulative_us = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, packages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark module import time.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (default: 5)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<18} {'median ms':>10}  browser packages")
+    for module in PARSE_MODULES + BROWSER_MODULES:
+        timings = []
+        packages = set()
+        for _ in range(args.runs):
+            elapsed, packages = measure_import(module)
+            if elapsed is None:
+                break
+            timings.append(elapsed)
+        if not timings:
+            print(f"{module:<18} {'n/a':>10}  import failed: {packages}")
+            failed = failed or module in PARSE_MODULES
+            continue
+
+        browser_packages = sorted(packages.intersection(BROWSER_PACKAGES))
+        print(f"{module:<18} {statistics.median(timings):>10.1f}  {', '.join(browser_packages) or '-'}")
+        if module in PARSE_MODULES and browser_packages:
+            failed = True
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,89 @@
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import zstandard
+
+POST = 'post'
+PROFILE = 'profile'
+
+# Characters kept when turning an ID into a file name
+UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+class CaptureArchive:
+    """
+    Folder of zstd-compressed raw page snapshots for one hashtag, keyed by ID.
+
+    Each post and profile is stored as one ``<kind>s/<id>.json.zst`` file holding
+    the page source plus the metadata needed to re-run extraction offline.
+    """
+
+    def __init__(self, root, level=10):
+        """
+        Args:
+            root (str): Archive folder, e.g. ``captures/<hashtag>``.
+            level (int): zstd compression level.
+        """
+        self.root = root
+        self.level = level
+
+    def path_for(self, kind, key):
+        """
+        Returns the archive file path for a post ID or profile username.
+        """
+        return os.path.join(self.root, f"{kind}s", f"{UNSAFE_FILENAME_CHARS.sub('_', key)}.json.zst")
+
+    def save(self, kind, key, html, **metadata):
+        """
+        Writes a snapshot, replacing any earlier capture with the same key.
+
+        Args:
+            kind (str): POST or PROFILE.
+            key (str): Video ID for posts, username for profiles.
+            html (str): The raw page source.
+            **metadata: Extra fields stored with the snapshot, such as the post URL.
+        """
+        path = self.path_for(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            'kind': kind,
+            'key': key,
+            'captured_at': datetime.now(timezone.utc).isoformat(),
+            **metadata,
+            'html': html
+        }
+        data = zstandard.ZstdCompressor(level=self.level).compress(json.dumps(record).encode('utf-8'))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save_post(self, video_id, post_url, html):
+        self.save(POST, video_id, html, post_url=post_url)
+
+    def save_profile(self, username, html):
+        self.save(PROFILE, username, html)
+
+    def paths(self, kind):
+        """
+        Lists the archive files of one kind, sorted by name.
+        """
+        folder = os.path.join(self.root, f"{kind}s")
+        if not os.path.isdir(folder):
+            return []
+        return sorted(
+            os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.json.zst')
+        )
+
+
+def load_capture(path):
+    """
+    Reads one archive file back into its snapshot record.
+
+    Returns:
+        dict: The record with 'kind', 'key', 'captured_at', 'html' and any metadata.
+    """
+    with open(path, 'rb') as f:
+        return json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
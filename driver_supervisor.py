@@ -0,0 +1,177 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cookie fields accepted by WebDriver's add_cookie
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+
+class DriverSupervisor:
+    """
+    Owns the Chrome WebDriver for a long run and recycles it before it degrades.
+
+    The browser is restarted once it has served ``max_pages`` pages, its JS heap
+    (from CDP) exceeds ``max_heap_mb`` or its renderer processes exceed
+    ``max_renderer_mb``. Session cookies are carried over to the new browser, so
+    it stays logged in without a fresh login.
+    """
+
+    def __init__(self, driver=None, driver_factory=None, max_pages=300,
+                 max_heap_mb=1024, max_renderer_mb=2048, check_every=10):
+        """
+        Args:
+            driver (WebDriver, optional): An already running (and logged in) driver.
+            driver_factory (callable, optional): Creates a new driver when recycling. Defaults to get_chrome_driver.
+            max_pages (int): Pages served before the browser is recycled.
+            max_heap_mb (int): JS heap size in MB that triggers a recycle.
+            max_renderer_mb (int): Renderer processes' resident memory in MB that triggers a recycle.
+            check_every (int): Number of pages between memory checks.
+        """
+        if driver_factory is None:
+            from scrape_url_lists import get_chrome_driver
+            driver_factory = get_chrome_driver
+        self.driver_factory = driver_factory
+        self.driver = driver or driver_factory()
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self.max_renderer_mb = max_renderer_mb
+        self.check_every = check_every
+        self.pages_served = 0
+        self.recycle_count = 0
+        self.cookies = []
+        self._last_check = 0
+        self._performance_enabled = False
+
+    def page_served(self):
+        """
+        Records that the driver has loaded one more page.
+        """
+        self.pages_served += 1
+
+    def is_alive(self):
+        """
+        Checks whether the WebDriver session still responds.
+        """
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def heap_mb(self):
+        """
+        Returns the JS heap size of the current page in MB, as reported by CDP.
+        """
+        if not self._performance_enabled:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            self._performance_enabled = True
+        metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})
+        for metric in metrics.get('metrics', []):
+            if metric['name'] == 'JSHeapTotalSize':
+                return metric['value'] / (1024 * 1024)
+        return 0
+
+    def renderer_mb(self):
+        """
+        Returns the resident memory of the browser's renderer processes in MB, or 0 if unknown.
+        """
+        import psutil
+
+        browser_pid = getattr(self.driver, 'browser_pid', None)
+        if not browser_pid:
+            return 0
+        total = 0
+        for child in psutil.Process(browser_pid).children(recursive=True):
+            try:
+                if '--type=renderer' in child.cmdline():
+                    total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def memory_exceeded(self):
+        """
+        Checks the browser's heap and renderer memory against their thresholds.
+        """
+        try:
+            heap = self.heap_mb()
+            renderer = self.renderer_mb()
+        except Exception as e:
+            logger.warning(f"Error reading driver memory: {str(e)}")
+            return False
+        logger.debug(f"Driver memory: heap {heap:.0f} MB, renderer {renderer:.0f} MB")
+        if heap >= self.max_heap_mb or renderer >= self.max_renderer_mb:
+            logger.info(f"Driver memory at heap {heap:.0f} MB, renderer {renderer:.0f} MB, recycling")
+            return True
+        return False
+
+    def save_session(self):
+        """
+        Keeps a copy of the current session cookies so a recycled browser can reuse them.
+        """
+        try:
+            self.cookies = self.driver.get_cookies()
+        except Exception as e:
+            logger.warning(f"Error saving session cookies: {str(e)}")
+
+    def restore_session(self):
+        """
+        Loads the saved session cookies into the current browser.
+        """
+        if not self.cookies:
+            logger.warning("No saved session to restore; the new driver is not logged in")
+            return
+        self.driver.get("https://www.tiktok.com")
+        time.sleep(2)
+        for cookie in self.cookies:
+            try:
+                self.driver.add_cookie({k: v for k, v in cookie.items() if k in COOKIE_FIELDS})
+            except Exception as e:
+                logger.debug(f"Skipping cookie {cookie.get('name')}: {str(e)}")
+        self.driver.refresh()
+        time.sleep(2)
+        logger.info(f"Restored {len(self.cookies)} session cookies")
+
+    def recycle(self):
+        """
+        Replaces the browser with a fresh one carrying over the logged-in session.
+        """
+        if self.is_alive():
+            self.save_session()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting old driver: {str(e)}")
+        self.driver = self.driver_factory()
+        self._performance_enabled = False
+        self.pages_served = 0
+        self._last_check = 0
+        self.recycle_count += 1
+        self.restore_session()
+        logger.info(f"Driver recycled ({self.recycle_count} so far)")
+
+    def check(self):
+        """
+        Recycles the browser if it has died or crossed a threshold. Memory is
+        sampled, and the session cookies saved, every ``check_every`` pages.
+
+        Returns:
+            bool: True if the driver was replaced.
+        """
+        if not self.is_alive():
+            logger.error("WebDriver session expired. Restarting driver...")
+            self.recycle()
+            return True
+        if self.pages_served >= self.max_pages:
+            logger.info(f"Driver served {self.pages_served} pages, recycling")
+            self.recycle()
+            return True
+        if self.cookies and self.pages_served - self._last_check < self.check_every:
+            return False
+        self._last_check = self.pages_served
+        self.save_session()
+        if self.memory_exceeded():
+            self.recycle()
+            return True
+        return False
@@ -0,0 +1,319 @@
+import json
+import logging
+import re
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from records import Comment, Profile
+
+logger = logging.getLogger(__name__)
+
+# Updated comment container selectors based on TikTok's HTML structure
+COMMENT_CONTAINER_SELECTORS = [
+    'div[class*="DivCommentContentWrapper"]',
+    'div[class*="css-1bkazzl-DivCommentContentWrapper"]',
+    'div[class*="DivCommentObjectWrapper"]'
+]
+
+USERNAME_SELECTORS = [
+    'div[class*="DivUsernameContentWrapper"] a[href*="/@"]',
+    'a[class="link-diy-focus"]',
+    'div[class*="css-1c5c5rm-DivCommentHeaderWrapper"] a',
+    'div[class*="DivCardAvatar"] p[class*="user-name"]',
+    'div[class*="DivCardAvatar"] h4[class*="UserTitle"] p',
+    'div[class*="DivCardAvatar"] a[title]'
+]
+
+# Comment text selectors used when no comment-level span is present
+FALLBACK_TEXT_SELECTORS = [
+    'span[class*="TUXText"][class*="StyledTUXText"]',
+    'div[class*="DivCommentContentSplitWrapper"] span[class*="TUXText"]',
+    'p[class*="TUXText TUXText--tiktok-sans TUXText--weight-medium"]'
+]
+
+# Markers TikTok renders once the comment list has been exhausted
+END_OF_COMMENTS_SELECTORS = [
+    'div[class*="DivNoMoreComment"]',
+    'div[class*="DivCommentListEnd"]',
+    'p[data-e2e="comment-no-more"]'
+]
+
+# Profile elements holding the bio and the external bio links
+PROFILE_E2E_ATTRS = ['user-bio', 'user-link']
+
+# A URL that starts with a scheme such as "https:" or "mailto:"
+URL_SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+# Script tag holding the page's embedded JSON state
+REHYDRATION_SCRIPT_PATTERN = re.compile(
+    r'<script[^>]*id="__UNIVERSAL_DATA_FOR_REHYDRATION__"[^>]*>(.*?)</script>', re.DOTALL
+)
+
+
+def extract_contact_info(text):
+    """Extract contact information from text using regex patterns"""
+    logger.debug(f"Extracting contact information from text: {text[:100]}...")
+    contact_info = {
+        'email': '',
+        'whatsapp': '',
+        'phone': ''
+    }
+
+    # Email pattern
+    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+    email_match = re.search(email_pattern, text)
+    if email_match:
+        contact_info['email'] = email_match.group()
+        logger.info(f"Found email: {contact_info['email']}")
+
+    # WhatsApp pattern (various formats)
+    whatsapp_patterns = [
+        r'wa\.me/\d+',
+        r'whatsapp\.com/\d+',
+        r'WhatsApp:?\s*[+]?\d+',
+        r'WA:?\s*[+]?\d+'
+    ]
+    for pattern in whatsapp_patterns:
+        whatsapp_match = re.search(pattern, text)
+        if whatsapp_match:
+            contact_info['whatsapp'] = whatsapp_match.group()
+            logger.info(f"Found WhatsApp: {contact_info['whatsapp']}")
+            break
+
+    # Phone pattern
+    phone_pattern = r'(?:(?:\+|00)[1-9]\d{0,3}[\s.-]?)?(?:\d{1,4}[\s.-]?){1,4}\d{4}'
+    phone_match = re.search(phone_pattern, text)
+    if phone_match:
+        contact_info['phone'] = phone_match.group()
+        logger.info(f"Found phone: {contact_info['phone']}")
+
+    return contact_info
+
+
+def _extract_comment(container):
+    """
+    Extracts a single comment from its container element.
+
+    Returns:
+        Comment or None: None if the author or text cannot be found.
+    """
+    username = None
+    for selector in USERNAME_SELECTORS:
+        username_elem = container.select_one(selector)
+        if username_elem:
+            href = username_elem.get('href', '')
+            if '/@' in href:
+                username = href.split('/@')[1].split('?')[0]
+            elif selector.endswith('[title]'):
+                username = username_elem.get('title')
+            else:
+                username = username_elem.text
+            if username and username.strip():
+                username = username.strip()
+                logger.debug(f"Found comments author: {username}")
+                break
+
+    # Updated comment text selectors to handle nested levels
+    comment_text = None
+    comment_level = None
+    parent_comment = None
+
+    # First try to find the comment level
+    for level in range(1, 10):  # Check up to 10 levels deep
+        comment_elem = container.select_one(f'span[data-e2e="comment-level-{level}"]')
+        if comment_elem:
+            comment_text = comment_elem.get_text(strip=True)
+            comment_level = level
+
+            # If it's a reply (level > 1), try to find the parent comment
+            if level > 1:
+                try:
+                    # Look for parent container
+                    parent_container = container.find_previous_sibling('div', {'class': lambda x: x and 'DivCommentContentWrapper' in x})
+                    if parent_container:
+                        parent_username_elem = parent_container.select_one('div[class*="DivUsernameContentWrapper"] a[href*="/@"]')
+                        if parent_username_elem:
+                            parent_href = parent_username_elem.get('href', '')
+                            if '/@' in parent_href:
+                                parent_comment = parent_href.split('/@')[1].split('?')[0]
+                except Exception as e:
+                    logger.debug(f"Error finding parent comment: {str(e)}")
+            break
+
+    # If no comment found with level attribute, try fallback selectors
+    if not comment_text:
+        for selector in FALLBACK_TEXT_SELECTORS:
+            comment_elem = container.select_one(selector)
+            if comment_elem:
+                comment_text = comment_elem.get_text(strip=True)
+                comment_level = 1  # Assume top level if we can't determine
+                break
+
+    if username and comment_text:
+        return Comment(username, comment_text, comment_level, parent_comment)
+    return None
+
+
+def extract_comments(html):
+    """
+    Extracts the comments rendered in a post page snapshot.
+
+    Args:
+        html (str): Page source of a TikTok post.
+
+    Returns:
+        tuple: (comments, reached_end) where comments is a list of unique Comment
+        records in page order and reached_end tells whether an end-of-list marker is present.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Find comment containers using multiple selectors
+    comment_containers = []
+    for selector in COMMENT_CONTAINER_SELECTORS:
+        containers = soup.select(selector)
+        if containers:
+            comment_containers = containers
+            break
+
+    comments = []
+    seen = set()
+    for container in comment_containers:
+        try:
+            comment = _extract_comment(container)
+        except Exception as e:
+            logger.error(f"Error processing comment: {str(e)}")
+            continue
+        if comment and comment not in seen:
+            seen.add(comment)
+            comments.append(comment)
+
+    reached_end = any(soup.select_one(selector) for selector in END_OF_COMMENTS_SELECTORS)
+    return comments, reached_end
+
+
+def _is_tiktok_host(netloc):
+    """
+    Checks whether a URL's host is tiktok.com or one of its subdomains.
+    """
+    host = netloc.lower().split('@')[-1].split(':')[0]
+    return host == 'tiktok.com' or host.endswith('.tiktok.com')
+
+
+def _split_web_url(href):
+    """
+    Splits an http(s) URL, assuming https for bare links such as "linktr.ee/name".
+
+    Returns:
+        SplitResult or None: None for links with any other scheme (mailto:, tel:, ...).
+    """
+    if '://' not in href:
+        scheme = URL_SCHEME_PATTERN.match(href)
+        # "host:8080/path" is a bare link with a port, "mailto:x@y.com" is not a web link
+        if scheme and not href[scheme.end():][:1].isdigit():
+            return None
+        href = f"https://{href}"
+    parts = urlsplit(href)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        return None
+    return parts
+
+
+def normalize_links(hrefs):
+    """
+    Normalizes profile links to deduplicated external URLs.
+
+    TikTok's outbound redirects are unwrapped to their target, links back into
+    TikTok (tiktok.com and its subdomains) and non-web links such as mailto: are
+    dropped, scheme and host are lowercased and trailing slashes removed.
+
+    Args:
+        hrefs (iterable): Raw hrefs or bio link texts such as "linktr.ee/name".
+
+    Returns:
+        tuple: External URLs in first-seen order.
+    """
+    links = []
+    for href in hrefs:
+        href = (href or '').strip()
+        if not href or href.startswith(('#', '/')):
+            continue
+        parts = _split_web_url(href)
+        if parts is not None and _is_tiktok_host(parts.netloc):
+            target = parse_qs(parts.query).get('target')
+            parts = _split_web_url(target[0]) if target else None
+            if parts is not None and _is_tiktok_host(parts.netloc):
+                continue
+        if parts is None:
+            continue
+        link = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+        if link not in links:
+            links.append(link)
+    return tuple(links)
+
+
+def build_profile(username, bio, hrefs):
+    """
+    Builds a Profile from a bio and its raw links, extracting contact information from the bio.
+    """
+    bio = (bio or '').strip()
+    contact_info = extract_contact_info(bio) if bio else {}
+    return Profile(username=username, bio=bio, links=normalize_links(hrefs), **contact_info)
+
+
+def profile_from_page(username, user, dom_bio, dom_hrefs):
+    """
+    Builds a Profile from the parts of a profile page, applying the same rule
+    to live pages and archived snapshots.
+
+    The bio comes from the embedded JSON state and falls back to the bio
+    element; links are the JSON bio link followed by every bio link element.
+
+    Args:
+        username (str): The profile's username.
+        user (dict or None): The user object from the page's embedded JSON state.
+        dom_bio (str): Text content of the bio element (its text nodes joined as-is), or '' if absent.
+        dom_hrefs (list): Hrefs of the bio link elements.
+
+    Returns:
+        Profile: The profile.
+    """
+    user = user or {}
+    bio_link = (user.get('bioLink') or {}).get('link')
+    hrefs = ([bio_link] if bio_link else []) + list(dom_hrefs)
+    return build_profile(username, user.get('signature') or dom_bio, hrefs)
+
+
+def _profile_state(html):
+    """
+    Returns the user object from the profile page's embedded JSON state, or None if absent.
+    """
+    match = REHYDRATION_SCRIPT_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        state = json.loads(match.group(1))
+        return state['__DEFAULT_SCOPE__']['webapp.user-detail']['userInfo']['user']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def extract_profile(html, username):
+    """
+    Extracts a user's bio, links and contact information from a profile page snapshot.
+
+    Reads the embedded JSON state and parses only the bio and bio link
+    elements rather than the whole document.
+
+    Args:
+        html (str): Page source of a TikTok profile.
+        username (str): The profile's username.
+
+    Returns:
+        Profile: The extracted profile.
+    """
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(attrs={'data-e2e': PROFILE_E2E_ATTRS}))
+    bio_element = soup.find(attrs={'data-e2e': 'user-bio'})
+    bio = bio_element.get_text() if bio_element else ''
+    hrefs = [link.get('href', '') for link in soup.find_all('a', attrs={'data-e2e': 'user-link'})]
+    return profile_from_page(username, _profile_state(html), bio, hrefs)
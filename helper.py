@@ -1,7 +1,7 @@
 import random
 import time
-from selenium.webdriver.common.by import By
 import json
+import re
 
 def scroll_page(driver):
     """
@@ -44,6 +44,8 @@ def scroll_element(driver, element_selector):
         driver (WebDriver): The Selenium WebDriver instance.
         element_selector (str): CSS selector for the element to scroll
     """
+    from selenium.webdriver.common.by import By
+
     try:
         # Find the comments container
         container = driver.find_element(By.CSS_SELECTOR, element_selector)
@@ -65,6 +67,37 @@ def scroll_element(driver, element_selector):
         print(f"Error scrolling container: {str(e)}")
         return False
     
+def parse_count(text, round_up=False):
+    """
+    Parse an abbreviated TikTok counter such as "1,234", "1 234", "12.5K" or "3M".
+
+    Args:
+        text (str): Counter text as rendered on the page.
+        round_up (bool): Return the largest count an abbreviated counter can stand for
+            (e.g. 1299 for "1.2K") instead of its face value, for use as an upper bound.
+
+    Returns:
+        int or None: The parsed count, or None if the text holds no number.
+    """
+    if not text:
+        return None
+    # Thousands may be grouped with commas, dots, spaces, no-break or narrow spaces
+    match = re.search(r'(\d+(?:[.,]\d+|[ \u00a0\u202f\u2009]\d{3}(?!\d))*)\s*([KkMmBb]?)', text)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    number = re.sub(r'[ \u00a0\u202f\u2009]', '', number)
+    multiplier = {'': 1, 'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}[suffix.lower()]
+    if suffix:
+        number = number.replace(',', '.')
+        count = round(float(number) * multiplier)
+        if round_up:
+            decimals = len(number.split('.')[1]) if '.' in number else 0
+            count += multiplier // 10 ** decimals - 1
+        return count
+    return int(number.replace(',', '').replace('.', ''))
+
+
 def load_json(json_file):
     with open(json_file, "r") as f:
         video_urls = json.load(f)
@@ -1,23 +1,29 @@
-from tiktok_scraper import TikTokScraper
 import logging
 import time
-from scrape_url_lists import scrape_tiktok_hashtag_videos, append_urls_to_json, get_chrome_driver
-from dotenv import load_dotenv
 import os
-from login import login_tiktok
-from helper import load_json
+from url_store import UrlStore, PENDING, FAILED
 
-load_dotenv(dotenv_path=".env") 
-Tiktok_account = os.getenv("TIKTOK_ACCOUNT")
-Tiktok_password = os.getenv("TIKTOK_PASSWORD")
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-logger.info(f"{Tiktok_account}: {Tiktok_password}")
-
 if __name__ == "__main__":
+    # Browser modules are imported here, not at module level: parsing pool workers
+    # started with "spawn" re-import this file as __mp_main__ and must stay light.
+    from dotenv import load_dotenv
+    from tiktok_scraper import TikTokScraper
+    from scrape_url_lists import iter_tiktok_hashtag_videos, get_chrome_driver
+    from login import login_tiktok
+    from driver_supervisor import DriverSupervisor
+
+    load_dotenv(dotenv_path=".env")
+    Tiktok_account = os.getenv("TIKTOK_ACCOUNT")
+    Tiktok_password = os.getenv("TIKTOK_PASSWORD")
+    Capture_raw_pages = os.getenv("CAPTURE_RAW_PAGES", "false").lower() == "true"
+    Parse_workers = int(os.getenv("PARSE_WORKERS", "0"))
+
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Using TikTok account: {Tiktok_account}")
+
     try:
         logger.info("Starting TikTok Scraper")
         
@@ -25,7 +31,8 @@ if __name__ == "__main__":
         hashtag = input("Enter the hashtag to scrape (without #): ").strip()
         max_videos = int(input("Enter the maximum number of posts to scrape: ").strip())
         output_file = f"tiktok_scrape_{hashtag}_{time.strftime('%Y%m%d_%H%M%S')}.csv"
-        urls_output_file = f"urls_lists/{hashtag}.json"
+        url_store = UrlStore(f"urls_lists/{hashtag}.db")
+        logger.info(f"Imported {url_store.import_json(f'urls_lists/{hashtag}.json')} URLs from the legacy JSON list")
 
         logger.info(f"Input parameters - Hashtag: #{hashtag}, Max Posts: {max_videos}")
         logger.info("Trying to login...")
@@ -34,27 +41,35 @@ if __name__ == "__main__":
         # Login to Tiktok
         login_tiktok(driver, Tiktok_account, Tiktok_password)
 
-        # Start by sraping the url list
-        video_urls = scrape_tiktok_hashtag_videos(
-            driver, hashtag, max_videos=max_videos, batch_size=50, rest_seconds=5, user_data_dir=None, retry_delay=2, max_retries=1 
-        )
-
-        # Append the URLs to the JSON file
-        append_urls_to_json(video_urls, urls_output_file)
+        # Start by sraping the url list, storing each URL as soon as it is found.
+        # Comment scraping shares this driver, so it starts only once discovery is done.
+        for video_id, video_url in iter_tiktok_hashtag_videos(
+            driver, hashtag, max_videos=max_videos, batch_size=50, rest_seconds=5, retry_delay=2, max_retries=1
+        ):
+            url_store.add(video_id, video_url)
+        logger.info(f"URL store for #{hashtag} holds {len(url_store)} videos")
         
-        # Initialize scraper
-        scraper = TikTokScraper(driver=driver)
+        # Initialize scraper, recycling the logged-in browser before it slows down
+        supervisor = DriverSupervisor(driver, max_pages=300, max_heap_mb=1024, max_renderer_mb=2048)
+        supervisor.save_session()
+        archive = None
+        if Capture_raw_pages:
+            from capture_archive import CaptureArchive
+            archive = CaptureArchive(f"captures/{hashtag}")
+        scraper = TikTokScraper(driver=driver, supervisor=supervisor, archive=archive, parse_workers=Parse_workers)
         
         # Scrape data
         logger.info(f"Starting to scrape posts with hashtag #{hashtag}")
 
-        # load the urls first
-        video_urls = load_json(urls_output_file)
-        scraper.scrape_hashtag(hashtag, video_urls, batch_size=3, output_file=output_file)
+        # Scrape every video that has not been processed yet, retrying ones that failed before
+        video_urls = url_store.urls(status=(PENDING, FAILED))
+        scraper.scrape_hashtag(hashtag, video_urls, batch_size=3, output_file=output_file, url_store=url_store)
             
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}", exc_info=True)
         
     finally:
         if 'scraper' in locals():
-            scraper.close_driver()
\ No newline at end of file
+            scraper.close_driver()
+        if 'url_store' in locals():
+            url_store.close()
@@ -0,0 +1,81 @@
+import csv
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+# Column order of the output CSV
+CSV_FIELDNAMES = [
+    'hashtag',
+    'post_url',
+    'post_author',
+    'commenter_username',
+    'comment_text',
+    'comment_level',
+    'parent_comment',
+    'commenter_bio',
+    'commenter_email',
+    'commenter_whatsapp',
+    'commenter_phone',
+    'commenter_links'
+]
+
+
+@dataclass(frozen=True, slots=True)
+class Comment:
+    """A single comment scraped from a post."""
+    username: str
+    comment_text: str
+    comment_level: int
+    parent_comment: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """A commenter's profile. Shared by every row for comments from that user."""
+    username: str
+    bio: str = ''
+    email: str = ''
+    whatsapp: str = ''
+    phone: str = ''
+    links: tuple = ()
+
+
+@dataclass(slots=True)
+class OutputRow:
+    """One output row, referencing its comment and the commenter's shared profile."""
+    hashtag: str
+    post_url: str
+    post_author: Optional[str]
+    comment: Comment
+    profile: Profile
+
+    def to_csv_dict(self):
+        """
+        Flattens the row into a dict keyed by CSV_FIELDNAMES.
+        """
+        return {
+            'hashtag': self.hashtag,
+            'post_url': self.post_url,
+            'post_author': self.post_author or '',
+            'commenter_username': self.comment.username,
+            'comment_text': self.comment.comment_text,
+            'comment_level': self.comment.comment_level,
+            'parent_comment': self.comment.parent_comment or '',
+            'commenter_bio': self.profile.bio,
+            'commenter_email': self.profile.email,
+            'commenter_whatsapp': self.profile.whatsapp,
+            'commenter_phone': self.profile.phone,
+            'commenter_links': '|'.join(self.profile.links)
+        }
+
+
+def append_rows_to_csv(rows, filepath):
+    """
+    Appends OutputRow records to a CSV file, writing the header if the file is new.
+    """
+    file_exists = os.path.isfile(filepath)
+    with open(filepath, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(row.to_csv_dict() for row in rows)
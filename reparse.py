@@ -0,0 +1,91 @@
+"""
+Re-runs comment and profile extraction over a capture archive, without a browser.
+
+After fixing a selector in extractors.py, rebuild the CSV from the pages captured
+during an earlier run instead of scraping again:
+
+    python reparse.py <hashtag> [--archive captures/<hashtag>] [--workers N]
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from capture_archive import CaptureArchive, load_capture, POST, PROFILE
+from extractors import extract_comments, extract_profile
+from records import OutputRow, Profile, append_rows_to_csv
+
+logger = logging.getLogger(__name__)
+
+
+def parse_capture(path):
+    """
+    Extracts one archived snapshot. Runs in a worker process.
+
+    Returns:
+        tuple: (kind, key, post_url, result) where result is a list of Comment
+        records for posts or a Profile for profiles. kind is None if the snapshot could not be parsed.
+    """
+    try:
+        record = load_capture(path)
+        if record['kind'] == POST:
+            comments, _ = extract_comments(record['html'])
+            return POST, record['key'], record.get('post_url', ''), comments
+        return PROFILE, record['key'], None, extract_profile(record['html'], record['key'])
+    except Exception as e:
+        logger.error(f"Error parsing capture {path}: {str(e)}")
+        return None, path, None, None
+
+
+def reparse_archive(hashtag, archive_root=None, workers=None):
+    """
+    Parses every post and profile in a capture archive across a process pool.
+
+    Args:
+        hashtag (str): The hashtag the archive was captured for.
+        archive_root (str, optional): Archive folder. Defaults to captures/<hashtag>.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        list: OutputRow records, one per archived comment.
+    """
+    archive = CaptureArchive(archive_root or f"captures/{hashtag}")
+    paths = archive.paths(POST) + archive.paths(PROFILE)
+    logger.info(f"Re-parsing {len(paths)} captured pages from {archive.root}")
+
+    posts = []
+    profiles = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for kind, key, post_url, result in pool.map(parse_capture, paths, chunksize=8):
+            if kind == POST:
+                posts.append((post_url, result))
+            elif kind == PROFILE:
+                profiles[key] = result
+
+    rows = []
+    for post_url, comments in posts:
+        post_author = comments[0].username if comments else None
+        for comment in comments:
+            profile = profiles.get(comment.username)
+            if profile is None:
+                profile = profiles[comment.username] = Profile(username=comment.username)
+            rows.append(OutputRow(hashtag, post_url, post_author, comment, profile))
+    return rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Rebuild the output CSV from a capture archive.")
+    parser.add_argument("hashtag", help="Hashtag the archive was captured for (without #)")
+    parser.add_argument("--archive", help="Archive folder (default: captures/<hashtag>)")
+    parser.add_argument("--workers", type=int, help="Number of parser processes (default: CPU count)")
+    args = parser.parse_args()
+
+    rows = reparse_archive(args.hashtag, archive_root=args.archive, workers=args.workers)
+    hashtag_folder = f"tiktok_scrapes/{args.hashtag}"
+    os.makedirs(hashtag_folder, exist_ok=True)
+    output_file = os.path.join(hashtag_folder, f"reparse_{args.hashtag}_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    append_rows_to_csv(rows, output_file)
+    logger.info(f"Wrote {len(rows)} records to {output_file}")
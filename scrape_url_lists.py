@@ -1,10 +1,6 @@
-import json
-import os
 import random
-from selenium import webdriver
-from selenium.webdriver.common.by import By
 import time
-import undetected_chromedriver as uc
+from url_store import canonicalize_video_url
 
 
 def get_chrome_driver(user_data_dir=None):
@@ -17,6 +13,8 @@ def get_chrome_driver(user_data_dir=None):
     Returns:
         WebDriver: Configured Selenium WebDriver instance.
     """
+    import undetected_chromedriver as uc
+
     options = uc.ChromeOptions()
     options.add_argument("--disable-notifications")  # Disable unnecessary notifications
 
@@ -61,45 +59,71 @@ def scroll_page(driver):
     print(f"Scrolled by {random_scroll}px.")
     random_delay(2, 4)
 
-def scrape_tiktok_hashtag_videos(driver, hashtag, max_videos=2000, batch_size=50, rest_seconds=5, user_data_dir=None, retry_delay=2, max_retries=3):
+# Returns, in one round-trip, the hrefs of all video anchors not returned by a
+# previous call and the page height, both read before scrolling so they include
+# what loaded during the last delay. Then scrolls to arguments[1] unless the
+# current position arguments[0] has already reached the bottom.
+HARVEST_SCRIPT = """
+const hrefs = [];
+for (const anchor of document.querySelectorAll('a[href*="/video/"]')) {
+    if (anchor.dataset.scraperSeen === anchor.href) continue;
+    anchor.dataset.scraperSeen = anchor.href;
+    hrefs.push(anchor.href);
+}
+const height = document.body.scrollHeight;
+if (arguments[0] < height) window.scrollTo(0, arguments[1]);
+return [hrefs, height];
+"""
+
+
+def iter_tiktok_hashtag_videos(driver, hashtag, max_videos=2000, batch_size=50, rest_seconds=5, retry_delay=2, max_retries=3):
     """
-    Scrapes TikTok video URLs from a hashtag page in batches with rest intervals.
+    Scrolls a TikTok hashtag page and yields each newly discovered video as soon as it is found.
     Only refreshes the page if the scroll reaches the bottom and no new videos are loaded.
+
+    The generator keeps the driver on the hashtag page between items, so the
+    caller must not navigate that driver until it is exhausted. Comment scraping
+    with the same driver can only start after discovery finishes.
+
+    Yields:
+        tuple: (video_id, url) for each unique video, in discovery order.
     """
-    # options = webdriver.ChromeOptions()
-    # options.add_argument("--disable-notifications")
-    # driver = get_chrome_driver(user_data_dir)
     driver.get(f"https://www.tiktok.com/tag/{hashtag}")
     random_delay(5, 10)
 
-    video_urls = []
+    seen_ids = set()
     last_count = 0
     retry_count = 0
+    rested_batches = 0
 
     try:
-        while len(video_urls) < max_videos:
-            scroll_height = driver.execute_script("return document.body.scrollHeight")
+        while len(seen_ids) < max_videos:
             current_scroll_position = 0
 
-            # Scroll and detect the bottom
-            while current_scroll_position < scroll_height:
-                current_scroll_position += random.randint(300, 800)  # Mimic a human scroll
-                driver.execute_script(f"window.scrollTo(0, {current_scroll_position});")
+            # Scroll and detect the bottom, harvesting new videos at every step
+            while True:
+                next_scroll_position = current_scroll_position + random.randint(300, 800)  # Mimic a human scroll
+                hrefs, scroll_height = driver.execute_script(
+                    HARVEST_SCRIPT, current_scroll_position, next_scroll_position
+                )
+
+                for href in hrefs:
+                    canonical = canonicalize_video_url(href)
+                    if not canonical or canonical[0] in seen_ids:
+                        continue
+                    seen_ids.add(canonical[0])
+                    print(f"Scraped: {canonical[1]} ({len(seen_ids)}/{max_videos})")
+                    yield canonical
+                    if len(seen_ids) >= max_videos:
+                        return
+
+                if current_scroll_position >= scroll_height:
+                    break
+                current_scroll_position = next_scroll_position
                 print(f"Scrolled to {current_scroll_position}px.")
                 random_delay(1, 3)
-                scroll_height = driver.execute_script("return document.body.scrollHeight")
-
-            # Check for new videos
-            videos = driver.find_elements(By.XPATH, '//a[contains(@href, "/video/")]')
-            for video in videos:
-                url = video.get_attribute("href")
-                if url and url not in video_urls:
-                    video_urls.append(url)
-                    print(f"Scraped: {url} ({len(video_urls)}/{max_videos})")
-                    if len(video_urls) >= max_videos:
-                        break
-
-            if len(video_urls) == last_count:
+
+            if len(seen_ids) == last_count:
                 retry_count += 1
                 print(f"No new videos found. Attempt {retry_count}/{max_retries}. Waiting for {retry_delay} seconds...")
                 random_delay(retry_delay, retry_delay + 3)
@@ -110,44 +134,27 @@ def scrape_tiktok_hashtag_videos(driver, hashtag, max_videos=2000, batch_size=50
                 print("Page refreshed. Continuing scraping...")
                 random_delay(5, 10)
             else:
-                last_count = len(video_urls)
+                last_count = len(seen_ids)
 
-            if len(video_urls) % batch_size == 0:
+            if len(seen_ids) // batch_size > rested_batches:
+                rested_batches = len(seen_ids) // batch_size
                 print(f"Resting for {rest_seconds} seconds...")
                 random_delay(rest_seconds, rest_seconds + 5)
 
     except Exception as e:
         print(f"Error scraping video URLs: {e}")
-    # finally:
-    #     driver.quit()
 
-    return video_urls
 
-
-def append_urls_to_json(new_urls, output_file):
+def scrape_tiktok_hashtag_videos(driver, hashtag, max_videos=2000, batch_size=50, rest_seconds=5, user_data_dir=None, retry_delay=2, max_retries=3):
     """
-    Appends unique URLs to a JSON file.
-
-    Args:
-        new_urls (list): The list of new URLs to append.
-        output_file (str): Path to the JSON file.
+    Scrapes TikTok video URLs from a hashtag page in batches with rest intervals.
 
     Returns:
-        None
+        list: Canonical video URLs, deduplicated by video ID in discovery order.
     """
-    # Load existing URLs from the file
-    if os.path.exists(output_file):
-        with open(output_file, "r") as f:
-            existing_urls = json.load(f)
-    else:
-        existing_urls = []
-
-    # Add only unique URLs
-    all_urls = list(set(existing_urls + new_urls))
-
-    # Save back to the JSON file
-    with open(output_file, "w") as f:
-        json.dump(all_urls, f, indent=4)
-    print(f"Updated {output_file} with {len(all_urls)} unique URLs.")
-
-
+    return [
+        url for _, url in iter_tiktok_hashtag_videos(
+            driver, hashtag, max_videos=max_videos, batch_size=batch_size, rest_seconds=rest_seconds,
+            retry_delay=retry_delay, max_retries=max_retries
+        )
+    ]
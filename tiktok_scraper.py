@@ -1,76 +1,109 @@
 import time
-import csv
 import random
 import logging
-from turtle import pos
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import os
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import re
-from datetime import datetime
-import os
-import time
-from helper import scroll_page
-from scrape_url_lists import get_chrome_driver
+from helper import parse_count
+from records import Profile, OutputRow, append_rows_to_csv
+from extractors import COMMENT_CONTAINER_SELECTORS, END_OF_COMMENTS_SELECTORS, extract_comments, profile_from_page
+from url_store import DONE, FAILED, canonicalize_video_url
+from driver_supervisor import DriverSupervisor
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+
+# Selectors for the comment total TikTok advertises on a post
+COMMENT_COUNT_SELECTORS = [
+    'strong[data-e2e="comment-count"]',
+    'strong[data-e2e="browse-comment-count"]',
+    'p[data-e2e="comment-title"]'
+]
+
+# Counts the replies rendered on the page and, while that count is below the reply
+# budget, clicks every collapsed "View N replies" or "View N more" control in one
+# round-trip. A control is clicked again once it re-renders with new text.
+# Returns the number of controls clicked and the replies rendered before clicking.
+EXPAND_REPLIES_SCRIPT = """
+const budget = arguments[0];
+const rendered = document.querySelectorAll(
+    'span[data-e2e^="comment-level-"]:not([data-e2e="comment-level-1"])'
+).length;
+let threads = 0;
+let requested = 0;
+const controls = document.querySelectorAll(
+    'div[class*="DivViewRepliesContainer"], p[data-e2e^="view-more"], span[data-e2e^="view-more"]'
+);
+for (const control of controls) {
+    if (rendered + requested >= budget) break;
+    const text = (control.innerText || '').trim();
+    if (!/^View\\b.*\\b(repl|more)/i.test(text)) continue;
+    if (control.dataset.scraperExpanded === text) continue;
+    control.dataset.scraperExpanded = text;
+    control.click();
+    threads += 1;
+    const match = text.match(/(\\d+)/);
+    requested += match ? parseInt(match[1], 10) : 1;
+}
+return {threads: threads, replies: rendered};
+"""
+
+# Reads the embedded JSON user state and the bio elements of the current profile
+# in one round-trip; profile_from_page merges them exactly as extract_profile does.
+PROFILE_SCRIPT = """
+const result = {user: null, bio: '', links: []};
+const state = document.getElementById('__UNIVERSAL_DATA_FOR_REHYDRATION__');
+if (state) {
+    try {
+        const user = JSON.parse(state.textContent).__DEFAULT_SCOPE__['webapp.user-detail'].userInfo.user;
+        result.user = {signature: user.signature, bioLink: user.bioLink};
+    } catch (e) {}
+}
+const bio = document.querySelector('[data-e2e="user-bio"]');
+if (bio) result.bio = bio.textContent;
+for (const link of document.querySelectorAll('a[data-e2e="user-link"]')) result.links.push(link.getAttribute('href'));
+return result;
+"""
+
+# Rough number of new comments a single scroll loads, used to bound scroll attempts
+COMMENTS_PER_SCROLL = 10
+
+# Consecutive snapshots without new comments after which scrolling stops
+MAX_STALLED_SCROLLS = 5
  
 class TikTokScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, supervisor=None, archive=None, parse_workers=0):
         """
         Initializes the TikTok scraper.
-        :param headless: If True, runs Chrome in headless mode.
+        :param driver: A logged-in Selenium WebDriver.
+        :param supervisor: DriverSupervisor that recycles the driver; one with default thresholds is created if omitted.
+        :param archive: Optional CaptureArchive that receives the raw page of every post and profile scraped.
+        :param parse_workers: Number of processes that parse comment snapshots while the browser keeps scrolling.
+            0 parses in the browser-driving thread.
         """
-        self.driver = driver
-        self.wait = WebDriverWait(self.driver, 10)
+        self.supervisor = supervisor or DriverSupervisor(driver)
+        self.archive = archive
+        self.parse_workers = parse_workers
+        self._parse_pool = None
         logger.info("TikTok Scraper initialized successfully")
 
-    def _extract_contact_info(self, text):
-        """Extract contact information from text using regex patterns"""
-        logger.debug(f"Extracting contact information from text: {text[:100]}...")
-        contact_info = {
-            'email': '',
-            'whatsapp': '',
-            'phone': ''
-        }
-        
-        # Email pattern
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_match = re.search(email_pattern, text)
-        if email_match:
-            contact_info['email'] = email_match.group()
-            logger.info(f"Found email: {contact_info['email']}")
-            
-        # WhatsApp pattern (various formats)
-        whatsapp_patterns = [
-            r'wa\.me/\d+',
-            r'whatsapp\.com/\d+',
-            r'WhatsApp:?\s*[+]?\d+',
-            r'WA:?\s*[+]?\d+'
-        ]
-        for pattern in whatsapp_patterns:
-            whatsapp_match = re.search(pattern, text)
-            if whatsapp_match:
-                contact_info['whatsapp'] = whatsapp_match.group()
-                logger.info(f"Found WhatsApp: {contact_info['whatsapp']}")
-                break
-                
-        # Phone pattern
-        phone_pattern = r'(?:(?:\+|00)[1-9]\d{0,3}[\s.-]?)?(?:\d{1,4}[\s.-]?){1,4}\d{4}'
-        phone_match = re.search(phone_pattern, text)
-        if phone_match:
-            contact_info['phone'] = phone_match.group()
-            logger.info(f"Found phone: {contact_info['phone']}")
-            
-        return contact_info
+    @property
+    def driver(self):
+        """The supervisor's current WebDriver, which changes when the browser is recycled."""
+        return self.supervisor.driver
+
+    @property
+    def wait(self):
+        return WebDriverWait(self.driver, 10)
+
+    def _get(self, url):
+        """Loads a page and counts it towards the supervisor's recycle threshold."""
+        self.driver.get(url)
+        self.supervisor.page_served()
 
     def scrape_user_profile(self, username):
         """
@@ -80,83 +113,208 @@ class TikTokScraper:
         try:
             profile_url = f"https://www.tiktok.com/@{username}"
             logger.debug(f"Navigating to profile URL: {profile_url}")
-            self.driver.get(profile_url)
+            self._get(profile_url)
             time.sleep(1)
 
-            profile_data = {
-                'username': username,
-                'bio': '',
-                'email': '',
-                'whatsapp': '',
-                'phone': '',
-                'links': []
-            }
-
             # Wait for profile content to load
             try:
                 logger.debug("Waiting for bio element to load")
-                bio_element = self.wait.until(
+                self.wait.until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, '[data-e2e="user-bio"]'))
                 )
-                profile_data['bio'] = bio_element.text.strip()
                 logger.info(f"Found bio for user {username}")
             except Exception as e:
                 logger.warning(f"Bio not found for user {username}: {str(e)}")
 
-            # Get page source after dynamic content loads
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-
-            # Extract all links
-            links = soup.find_all('a')
-            for link in links:
-                href = link.get('href', '')
-                if href and not href.startswith(('javascript:', '#')):
-                    profile_data['links'].append(href)
-                    logger.debug(f"Found link: {href}")
-
-            # Extract contact information from bio
-            if profile_data['bio']:
-                logger.debug("Extracting contact information from bio")
-                contact_info = self._extract_contact_info(profile_data['bio'])
-                profile_data.update(contact_info)
+            # Read only the bio and bio links after dynamic content loads
+            profile_data = self.driver.execute_script(PROFILE_SCRIPT)
+            profile = profile_from_page(username, profile_data['user'], profile_data['bio'], profile_data['links'])
+            if self.archive is not None:
+                self.archive.save_profile(username, self.driver.page_source)
 
             logger.info(f"Successfully scraped profile for user {username}")
-            return profile_data
+            return profile
 
         except Exception as e:
             logger.error(f"Error scraping profile for {username}: {str(e)}", exc_info=True)
             return None
 
-    def scrape_comments(self, post_url, max_comments=10000):
+    def _get_advertised_comment_count(self):
+        """
+        Reads the comment total shown on the current post, or None if it is not rendered.
+        Abbreviated totals such as "1.2K" are rounded up to the top of their range
+        (1299), so the count never stops scrolling short of the real total.
+        """
+        for selector in COMMENT_COUNT_SELECTORS:
+            try:
+                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                if elements:
+                    count = parse_count(elements[0].text, round_up=True)
+                    if count is not None:
+                        return count
+            except Exception as e:
+                logger.debug(f"Error reading comment count with {selector}: {str(e)}")
+        return None
+
+    def _expand_reply_threads(self, reply_budget):
+        """
+        Expands the collapsed and partially expanded reply threads on the page in a
+        single scripted batch, as long as fewer than ``reply_budget`` replies are rendered.
+
+        Args:
+            reply_budget (int): Maximum number of replies to have rendered on the page.
+                0 only counts the rendered replies.
+
+        Returns:
+            dict: Number of reply 'threads' controls clicked and 'replies' rendered before clicking.
+        """
+        try:
+            expanded = self.driver.execute_script(EXPAND_REPLIES_SCRIPT, reply_budget)
+            if expanded['threads']:
+                logger.info(f"Expanded {expanded['threads']} reply threads ({expanded['replies']} replies rendered)")
+                time.sleep(1.5)  # Let the expanded replies render
+            return expanded
+        except Exception as e:
+            logger.error(f"Error expanding reply threads: {str(e)}")
+            return {'threads': 0, 'replies': 0}
+
+    def _get_parse_pool(self):
+        """
+        Returns the snapshot parsing process pool, starting it on first use, or None if parsing is inline.
+        """
+        if self.parse_workers > 0 and self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            logger.info(f"Started {self.parse_workers} comment parsing processes")
+        return self._parse_pool
+
+    def _reset_parse_pool(self, pool):
+        """
+        Drops a pool broken by a dead worker; the next snapshot starts a fresh one.
+        """
+        if self._parse_pool is not pool:
+            return  # Already replaced
+        logger.warning("Comment parsing pool broke (a worker died). Restarting it...")
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            logger.debug(f"Error shutting down broken parsing pool: {str(e)}")
+        self._parse_pool = None
+
+    def _submit_parse(self, snapshot):
+        """
+        Submits a snapshot to the parsing pool.
+
+        Returns:
+            tuple: (future, pool, snapshot). future is None if the pool is broken,
+            in which case the snapshot is parsed inline when its result is taken.
+        """
+        pool = self._get_parse_pool()
+        try:
+            return pool.submit(extract_comments, snapshot), pool, snapshot
+        except BrokenProcessPool:
+            self._reset_parse_pool(pool)
+            return None, pool, snapshot
+
+    def _parsed_result(self, parse):
+        """
+        Unwraps a parse from _submit_parse, parsing the snapshot inline if the
+        pool broke under it and treating any other failed parse as an empty snapshot.
+        """
+        future, pool, snapshot = parse
+        if future is None:
+            return extract_comments(snapshot)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._reset_parse_pool(pool)
+            return extract_comments(snapshot)
+        except Exception as e:
+            logger.error(f"Error parsing comment snapshot: {str(e)}")
+            return [], False
+
+    def _end_marker_rendered(self):
+        """
+        Checks in the live page whether an end-of-comments marker is rendered.
+        """
+        try:
+            return self.driver.execute_script(
+                "return document.querySelector(arguments[0]) !== null;", ', '.join(END_OF_COMMENTS_SELECTORS)
+            )
+        except Exception as e:
+            logger.debug(f"Error checking for the end of the comment list: {str(e)}")
+            return False
+
+    def _merge_comments(self, page_comments, comments_data, seen_comments):
+        """
+        Adds the comments of one parsed snapshot that have not been seen yet.
+
+        Returns:
+            int: Number of new comments added.
+        """
+        added = 0
+        for comment_data in page_comments:
+            if comment_data not in seen_comments:
+                seen_comments.add(comment_data)
+                comments_data.append(comment_data)
+                added += 1
+                logger.info(f"Added level {comment_data.comment_level} comment from {comment_data.username}: {comment_data.comment_text[:50]}...")
+        return added
+
+    def scrape_comments(self, post_url, max_comments=10000, max_replies=1000):
         """
         Scrapes comments from a TikTok post using updated selectors.
         Monitors URL changes while scrolling to detect navigation away from the post.
+
+        Scrolling stops once the post's advertised comment count or the
+        ``max_comments`` budget is reached, or an end-of-list marker appears.
+        The number of scroll attempts is derived from that budget, so the
+        time spent on a single post stays bounded.
+
+        Collapsed reply threads, including "View N more" continuations, are
+        expanded in batches until ``max_replies`` replies are rendered.
+
+        With ``parse_workers`` set, this thread only scrolls and snapshots the
+        page; snapshots are parsed in the process pool and their comments are
+        merged in snapshot order, so scrolling and parsing overlap. Whenever the
+        newest snapshot could end the scroll, its result is awaited first.
+
+        Raises:
+            Exception: Any error loading or scrolling the post is re-raised after logging,
+                so the caller can mark the post as failed.
         """
         logger.info(f"Starting to scrape comments from post: {post_url}")
         comments_data = []
+        seen_comments = set()
+        pending_parses = deque()  # Snapshots being parsed, oldest first
+        page_loaded = False
         post_url = str(post_url)
         try:
-            self.driver.get(post_url)
+            self._get(post_url)
+            page_loaded = True
             logger.info(f"Get the post url: {post_url}")
             time.sleep(2)  # Wait for initial load
             original_url = self.driver.current_url
             logger.info(f"Original url: {original_url}")
 
+            advertised_count = self._get_advertised_comment_count()
+            if advertised_count is not None:
+                logger.info(f"Post advertises {advertised_count} comments")
+                if advertised_count == 0:
+                    return comments_data
+                comment_budget = min(max_comments, advertised_count)
+            else:
+                comment_budget = max_comments
+
             scroll_attempts = 0
-            max_scroll_attempts = 10000  # Increased to allow for more scrolling
+            max_scroll_attempts = math.ceil(comment_budget / COMMENTS_PER_SCROLL) + 5
             no_new_comments_count = 0
-            prev_comment_count = 0
-
-            # Updated comment container selectors based on TikTok's HTML structure
-            comment_container_selectors = [
-                'div[class*="DivCommentContentWrapper"]',
-                'div[class*="css-1bkazzl-DivCommentContentWrapper"]',
-                'div[class*="DivCommentObjectWrapper"]'
-            ]
+            max_snapshot_growth = COMMENTS_PER_SCROLL  # Most new comments one snapshot has added
+            reached_end = False
+            expanded_threads = 0
 
             # Wait for comments to load
             try:
-                for selector in comment_container_selectors:
+                for selector in COMMENT_CONTAINER_SELECTORS:
                     try:
                         self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
                         logger.info(f"Comment container found using selector: {selector}")
@@ -167,111 +325,56 @@ class TikTokScraper:
                 logger.warning(f"Timeout waiting for comments to load: {str(e)}")
                 return comments_data
 
-            while len(comments_data) < max_comments and scroll_attempts < max_scroll_attempts:
+            while len(comments_data) < comment_budget and scroll_attempts < max_scroll_attempts:
                 # Check if we've navigated away from the original post
                 current_url = self.driver.current_url
                 if current_url != original_url:
                     logger.warning(f"URL changed from {original_url} to {current_url}. Stopping comment collection.")
                     break
+
+                expanded = self._expand_reply_threads(max_replies)
+                expanded_threads += expanded['threads']
                 
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                
-                # Find comment containers using multiple selectors
-                comment_containers = []
-                for selector in comment_container_selectors:
-                    containers = soup.select(selector)
-                    if containers:
-                        comment_containers = containers
-                        break
+                snapshot = self.driver.page_source
+                if self.parse_workers <= 0:
+                    page_results = [extract_comments(snapshot)]
+                else:
+                    pending_parses.append(self._submit_parse(snapshot))
+                    # When the newest snapshot could stop the scroll, wait for it so no scroll
+                    # is spent on stale results; otherwise take only the parses already finished.
+                    # Results are taken oldest first, so stalls are counted in snapshot order.
+                    stop_possible = (
+                        no_new_comments_count + len(pending_parses) >= MAX_STALLED_SCROLLS
+                        or comment_budget - len(comments_data) <= max_snapshot_growth * len(pending_parses)
+                        or self._end_marker_rendered()
+                    )
+                    page_results = []
+                    while pending_parses and (
+                        stop_possible
+                        or len(pending_parses) > self.parse_workers * 2
+                        or pending_parses[0][0] is None
+                        or pending_parses[0][0].done()
+                    ):
+                        page_results.append(self._parsed_result(pending_parses.popleft()))
+
+                for page_comments, page_end in page_results:
+                    added = self._merge_comments(page_comments, comments_data, seen_comments)
+                    if added:
+                        no_new_comments_count = 0
+                        max_snapshot_growth = max(max_snapshot_growth, added)
+                    else:
+                        no_new_comments_count += 1
+                    reached_end = reached_end or page_end
+
+                if len(comments_data) >= comment_budget:
+                    logger.info(f"Reached comment budget of {comment_budget}. Stopping...")
+                    break
 
-                for container in comment_containers:
-                    try:
-                        # Updated username selectors
-                        username_selectors = [
-                            'div[class*="DivUsernameContentWrapper"] a[href*="/@"]',
-                            'a[class="link-diy-focus"]',
-                            'div[class*="css-1c5c5rm-DivCommentHeaderWrapper"] a',
-                            'div[class*="DivCardAvatar"] p[class*="user-name"]',
-                            'div[class*="DivCardAvatar"] h4[class*="UserTitle"] p',
-                            'div[class*="DivCardAvatar"] a[title]'
-                        ]
-                        
-                        username = None
-                        for selector in username_selectors:
-                            username_elem = container.select_one(selector)
-                            if username_elem:
-                                href = username_elem.get('href', '')
-                                if '/@' in href:
-                                    username = href.split('/@')[1].split('?')[0]
-                                elif selector.endswith('[title]'):
-                                    username = username_elem.get('title')
-                                else:
-                                    username = username_elem.text
-                                if username and username.strip():
-                                    username = username.strip()
-                                    logger.info(f"Found comments author: {username}")
-                                    break
-
-                        # Updated comment text selectors to handle nested levels
-                        comment_text = None
-                        comment_level = None
-                        parent_comment = None
-                        
-                        # First try to find the comment level
-                        for level in range(1, 10):  # Check up to 10 levels deep
-                            level_selector = f'span[data-e2e="comment-level-{level}"]'
-                            comment_elem = container.select_one(level_selector)
-                            if comment_elem:
-                                comment_text = comment_elem.get_text(strip=True)
-                                comment_level = level
-                                
-                                # If it's a reply (level > 1), try to find the parent comment
-                                if level > 1:
-                                    try:
-                                        # Look for parent container
-                                        parent_container = container.find_previous_sibling('div', {'class': lambda x: x and 'DivCommentContentWrapper' in x})
-                                        if parent_container:
-                                            parent_username_elem = parent_container.select_one('div[class*="DivUsernameContentWrapper"] a[href*="/@"]')
-                                            if parent_username_elem:
-                                                parent_href = parent_username_elem.get('href', '')
-                                                if '/@' in parent_href:
-                                                    parent_comment = parent_href.split('/@')[1].split('?')[0]
-                                    except Exception as e:
-                                        logger.debug(f"Error finding parent comment: {str(e)}")
-                                break
-
-                        # If no comment found with level attribute, try fallback selectors
-                        if not comment_text:
-                            fallback_selectors = [
-                                'span[class*="TUXText"][class*="StyledTUXText"]',
-                                'div[class*="DivCommentContentSplitWrapper"] span[class*="TUXText"]',
-                                'p[class*="TUXText TUXText--tiktok-sans TUXText--weight-medium"]'
-                            ]
-                            
-                            for selector in fallback_selectors:
-                                comment_elem = container.select_one(selector)
-                                if comment_elem:
-                                    comment_text = comment_elem.get_text(strip=True)
-                                    comment_level = 1  # Assume top level if we can't determine
-                                    break
-
-                        if username and comment_text:
-                            comment_data = {
-                                'username': username,
-                                'comment_text': comment_text,
-                                'comment_level': comment_level,
-                                'parent_comment': parent_comment
-                            }
-                            
-                            if comment_data not in comments_data:
-                                comments_data.append(comment_data)
-                                logger.info(f"Added level {comment_level} comment from {username}: {comment_text[:50]}...")
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing comment: {str(e)}")
-                        continue
+                if reached_end:
+                    logger.info("Reached the end of the comment list. Stopping...")
+                    break
 
-                if len(comments_data) < max_comments:
+                if len(comments_data) < comment_budget:
                     try:
                         # Scroll with a larger increment and add some randomization
                         current_scroll = self.driver.execute_script("return window.pageYOffset;")
@@ -295,25 +398,63 @@ class TikTokScraper:
                     logger.warning(f"URL changed after scrolling from {original_url} to {current_url}. Stopping comment collection.")
                     break
 
-                if prev_comment_count == len(comments_data):
-                    no_new_comments_count += 1
-                else:
-                    no_new_comments_count = 0
-                    prev_comment_count = len(comments_data)
-
-                # Increase tolerance for no new comments
-                if no_new_comments_count >= 5:
+                # Increase tolerance for no new comments. When capturing, a post whose
+                # comments cannot be extracted keeps scrolling until the end-of-list
+                # marker or the scroll limit, so the archive holds the whole thread.
+                extraction_broken = self.archive is not None and not comments_data and (advertised_count or 0) > 0
+                if no_new_comments_count >= MAX_STALLED_SCROLLS and not extraction_broken:
                     logger.info("No new comments found after multiple scroll attempts. Stopping...")
                     break
 
+            # Collect the snapshots still being parsed
+            while pending_parses:
+                self._merge_comments(self._parsed_result(pending_parses.popleft())[0], comments_data, seen_comments)
+
             logger.info(f"Finished scraping comments. Found {len(comments_data)} comments after {scroll_attempts} scroll attempts")
+            expanded_replies = self._expand_reply_threads(0)['replies']
+            logger.info(f"Expanded {expanded_threads} reply threads ({expanded_replies} replies rendered)")
             return comments_data
             
         except Exception as e:
             logger.error(f"Error scraping comments: {str(e)}")
-            return comments_data
+            raise
+
+        finally:
+            # Capture whatever the page holds on every exit path, including errors
+            if self.archive is not None and page_loaded:
+                self._capture_post(post_url)
+
+    def _capture_post(self, post_url):
+        """
+        Stores the current post page in the capture archive, keyed by its video ID.
+        """
+        try:
+            canonical = canonicalize_video_url(post_url)
+            video_id = canonical[0] if canonical else post_url
+            self.archive.save_post(video_id, post_url, self.driver.page_source)
+        except Exception as e:
+            logger.error(f"Error capturing post {post_url}: {str(e)}")
+
+    def _scrape_profile_supervised(self, username):
+        """
+        Scrapes a profile, recycling the driver first if needed and retrying once
+        if the driver dies during the scrape.
+
+        Returns:
+            Profile or None: None if the profile could not be scraped.
+        """
+        for _ in range(2):
+            self.supervisor.check()
+            try:
+                profile = self.scrape_user_profile(username)
+            except Exception as e:
+                logger.error(f"Error getting profile for {username}: {str(e)}")
+                profile = None
+            if profile is not None or self.supervisor.is_alive():
+                break
+        return profile
 
-    def scrape_hashtag(self, hashtag, video_url_list, batch_size=1, output_file=None):
+    def scrape_hashtag(self, hashtag, video_url_list, batch_size=1, output_file=None, max_comments_per_post=10000, max_replies_per_post=1000, url_store=None):
         """
         Scrapes TikTok posts with a specific hashtag and their comments
         
@@ -321,26 +462,31 @@ class TikTokScraper:
             hashtag (str): The hashtag to search for (without the # symbol)
             max_posts (int): Maximum number of posts to scrape
             batch_size (int): Number of posts to process in each batch to avoid memory issues
+            max_comments_per_post (int): Maximum number of comments to collect from a single post
+            max_replies_per_post (int): Maximum number of replies to expand on a single post
+            url_store (UrlStore, optional): Store in which to record each video's processing status.
+                A video is marked done once its rows are written to the CSV, and failed if its
+                comment scrape raises or its rows cannot be written.
         
         Returns:
-            list: List of dictionaries containing post data, comments, and profile information
+            None. Each post's OutputRow records are appended to the CSV as it completes.
         """
         logger.info(f"Starting to scrape hashtag: #{hashtag}")
         processed_urls = set()
+        requeued_urls = set()
+        profiles = {}  # Commenter profiles scraped so far, shared by all of their rows
+        pending = deque(video_url_list)
+        started = 0
         
         try:
-            # Process videos in batches to manage memory and allow for partial success
-            for i, video_url in enumerate(video_url_list):
+            # Process videos one at a time, re-queuing a video once if the driver dies under it
+            while pending:
+                video_url = pending.popleft()
                 video_results = []
-                try:
-                    self.driver.execute_script("return document.readyState")  # Check if the session is still active
-                except:
-                    logger.error("WebDriver session expired. Restarting driver...")
-                    self.driver.quit()
-                    self.driver = get_chrome_driver()
-                    time.sleep(3)
-
-                logger.info(f"Processing video {i+1} of {len(video_url_list)}")
+                self.supervisor.check()
+
+                started += 1
+                logger.info(f"Processing video {started} of {started + len(pending)}")
                 
                 try:
                     if video_url in processed_urls:
@@ -350,88 +496,77 @@ class TikTokScraper:
                     logger.info(f"Processing video: {video_url}")
                     
                     # Get comments for this video
-                    comments = self.scrape_comments(video_url)
+                    try:
+                        comments = self.scrape_comments(
+                            video_url, max_comments=max_comments_per_post, max_replies=max_replies_per_post
+                        )
+                    except Exception:
+                        if not self.supervisor.is_alive() and video_url not in requeued_urls:
+                            logger.warning(f"Driver died while scraping {video_url}. Re-queuing it...")
+                            requeued_urls.add(video_url)
+                            pending.appendleft(video_url)
+                            continue
+                        raise
                     logger.info(f"Found {len(comments)} comments")
                     
                     # Extract username from URL or first comment
                     username = None
                     if comments and len(comments) > 0:
-                        username = comments[0].get('username')
+                        username = comments[0].username
                     
                     # Process each comment and get commenter profiles
                     for comment in comments:
-                        commenter_username = comment['username']
-                        
-                        # Get commenter's profile information
-                        try:
-                            profile_info = self.scrape_user_profile(commenter_username)
-                        except Exception as e:
-                            logger.error(f"Error getting profile for {commenter_username}: {str(e)}")
-                            profile_info = {}
+                        commenter_username = comment.username
                         
-                        # Combine all information
-                        result = {
-                            'hashtag': hashtag,
-                            'post_url': video_url,
-                            'post_author': username,
-                            'commenter_username': commenter_username,
-                            'comment_text': comment['comment_text'],
-                            'comment_level': comment['comment_level'],
-                            'parent_comment': comment['parent_comment'],
-                            'commenter_bio': profile_info.get('bio', ''),
-                            'commenter_contact': {
-                                'email': profile_info.get('email', ''),
-                                'whatsapp': profile_info.get('whatsapp', ''),
-                                'phone': profile_info.get('phone', '')
-                            },
-                            'commenter_links': profile_info.get('links', [])
-                        }
+                        # Get commenter's profile information, once per user; failed scrapes are retried on the next comment
+                        profile = profiles.get(commenter_username)
+                        if profile is None:
+                            profile = self._scrape_profile_supervised(commenter_username)
+                            if profile is not None:
+                                profiles[commenter_username] = profile
+                            else:
+                                profile = Profile(username=commenter_username)
                         
-                        video_results.append(result)
+                        video_results.append(OutputRow(hashtag, video_url, username, comment, profile))
                         
                     processed_urls.add(video_url)
                     logger.info(f"Successfully processed video: {video_url}")
                     
                 except Exception as e:
                     logger.error(f"Error processing video {video_url}: {str(e)}")
+                    if url_store is not None:
+                        url_store.set_status(video_url, FAILED)
                     continue
                 
-                # Save results after each batch
+                # Save results after each post; it counts as done only once its rows are on disk
+                saved = True
                 if video_results:
                     logger.info(f"Saving results to {output_file}")
-                    self.save_to_csv(video_results, output_file)
-                    logger.info(f"Saved {len(video_results)} results so far")
+                    saved = self.save_to_csv(video_results, output_file)
+                    if saved:
+                        logger.info(f"Saved {len(video_results)} results so far")
+                    else:
+                        processed_urls.discard(video_url)
+                if url_store is not None:
+                    url_store.set_status(video_url, DONE if saved else FAILED)
         except Exception as e:
             logger.error(f"Error scraping hashtag: {str(e)}")
             return 
 
     def save_to_csv(self, data, filename="tiktok_data.csv"):
         """
-        Saves scraped data to a CSV file within a structured folder and appends new data.
+        Saves scraped OutputRow records to a CSV file within a structured folder and appends new data.
+
+        Returns:
+            bool: True if the records were written.
         """
         if not data:
             logger.warning("No data to save")
-            return
+            return False
 
         try:
-            # Define all possible fields including flattened nested dictionaries
-            fieldnames = [
-                'hashtag',
-                'post_url',
-                'post_author',
-                'commenter_username',
-                'comment_text',
-                'comment_level',
-                'parent_comment',
-                'commenter_bio',
-                'commenter_email',
-                'commenter_whatsapp',
-                'commenter_phone',
-                'commenter_links'
-            ]
-
             # Get the hashtag name from the first entry in the data
-            hashtag = data[0].get('hashtag', 'unknown_hashtag')
+            hashtag = data[0].hashtag or 'unknown_hashtag'
             hashtag_folder = f"tiktok_scrapes/{hashtag}"
 
             # Create the directory if it doesn't exist
@@ -440,49 +575,22 @@ class TikTokScraper:
             # Generate filename
             filepath = os.path.join(hashtag_folder, filename)
 
-            # Check if file exists to decide whether to write headers
-            file_exists = os.path.isfile(filepath)
-
-            # Open file in append mode ('a') to keep adding new data
-            with open(filepath, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-                # Write headers only if the file does not already exist
-                if not file_exists:
-                    writer.writeheader()
-
-                # Flatten nested dictionaries
-                flattened_data = []
-                for item in data:
-                    flat_item = {
-                        'hashtag': item.get('hashtag', ''),
-                        'post_url': item.get('post_url', ''),
-                        'post_author': item.get('post_author', ''),
-                        'commenter_username': item.get('commenter_username', ''),
-                        'comment_text': item.get('comment_text', ''),
-                        'comment_level': item.get('comment_level', ''),
-                        'parent_comment': item.get('parent_comment', ''),
-                        'commenter_bio': item.get('commenter_bio', ''),
-                        'commenter_email': item.get('commenter_contact', {}).get('email', ''),
-                        'commenter_whatsapp': item.get('commenter_contact', {}).get('whatsapp', ''),
-                        'commenter_phone': item.get('commenter_contact', {}).get('phone', ''),
-                        'commenter_links': '|'.join(item.get('commenter_links', [])) if item.get('commenter_links') else ''
-                    }
-                    flattened_data.append(flat_item)
-
-                # Append new data to CSV
-                writer.writerows(flattened_data)
-
-                logger.info(f"Appended {len(flattened_data)} records to {filepath}")
+            append_rows_to_csv(data, filepath)
+            logger.info(f"Appended {len(data)} records to {filepath}")
+            return True
 
         except Exception as e:
             logger.error(f"Error saving to CSV: {str(e)}")
+            return False
 
 
     def close_driver(self):
         """
-        Closes the Selenium WebDriver
+        Closes the Selenium WebDriver and the snapshot parsing pool
         """
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
         logger.info("Closing web driver")
         self.driver.quit()
         logger.info("Web driver closed successfully")
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+# Matches a TikTok video link, capturing the canonical URL and its numeric video ID
+VIDEO_URL_PATTERN = re.compile(r'^(https?://[^?#]*?/video/(\d+))')
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def canonicalize_video_url(href):
+    """
+    Reduces a TikTok video href to its canonical URL and numeric video ID.
+
+    Args:
+        href (str): The href of a video link.
+
+    Returns:
+        tuple: (video_id, url) with query string and fragment removed, or None if href is not a video link.
+    """
+    match = VIDEO_URL_PATTERN.match(href or '')
+    if not match:
+        return None
+    url, video_id = match.groups()
+    return video_id, url
+
+
+class UrlStore:
+    """
+    Append-only SQLite store of discovered video URLs for one hashtag.
+
+    Each video is a row keyed by its video ID, so dedupe is an index lookup and
+    adding a URL writes only that URL. Rows keep discovery order, discovery time
+    and a processing status (pending, done or failed).
+    """
+
+    def __init__(self, db_path):
+        """
+        Opens the store, creating the database file and its folder if needed.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS videos (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                discovered_at TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_url ON videos (url)")
+        self.conn.commit()
+
+    def add(self, video_id, url):
+        """
+        Appends a video unless its ID is already stored.
+
+        Returns:
+            bool: True if the video was new.
+        """
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO videos (video_id, url, discovered_at) VALUES (?, ?, ?)",
+            (video_id, url, datetime.now(timezone.utc).isoformat())
+        )
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def add_urls(self, urls):
+        """
+        Appends raw video hrefs, canonicalizing each one and skipping non-video links.
+
+        Returns:
+            int: Number of new videos stored.
+        """
+        discovered_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for href in urls:
+            canonical = canonicalize_video_url(href)
+            if canonical:
+                rows.append((canonical[0], canonical[1], discovered_at))
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO videos (video_id, url, discovered_at) VALUES (?, ?, ?)", rows
+        )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def import_json(self, json_file):
+        """
+        Imports a legacy urls_lists/<hashtag>.json file, if it exists.
+
+        Returns:
+            int: Number of new videos stored.
+        """
+        if not os.path.exists(json_file):
+            return 0
+        with open(json_file, "r") as f:
+            return self.add_urls(json.load(f))
+
+    def urls(self, status=None):
+        """
+        Returns stored URLs in discovery order, optionally only those with the
+        given status or any of a tuple of statuses.
+        """
+        if status is None:
+            rows = self.conn.execute("SELECT url FROM videos ORDER BY seq")
+        else:
+            statuses = (status,) if isinstance(status, str) else tuple(status)
+            placeholders = ", ".join("?" for _ in statuses)
+            rows = self.conn.execute(
+                f"SELECT url FROM videos WHERE status IN ({placeholders}) ORDER BY seq", statuses
+            )
+        return [url for (url,) in rows]
+
+    def set_status(self, url, status):
+        """
+        Records the processing status of a stored URL.
+        """
+        self.conn.execute("UPDATE videos SET status = ? WHERE url = ?", (status, url))
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def close(self):
+        self.conn.close()